@@ -5,17 +5,32 @@ FastMCP (stdio) + FastAPI (HTTP) 듀얼 모드
 """
 
 import asyncio
+import heapq
 import os
-import httpx
+import sys
+import tempfile
+import time
+import types
+import aiohttp
+import orjson
 from datetime import datetime
-from mcp.server.fastmcp import FastMCP
-from fastapi import FastAPI, HTTPException
+from operator import itemgetter
+from typing import Any
+from fastapi import Body, FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, ConfigDict, ValidationError
 from contextlib import asynccontextmanager
 import uvicorn
 
-# ── MCP 서버 ──────────────────────────────────────────
-mcp = FastMCP("korean-crypto")
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# ── 설정 ────────────────────────────────────────────
+# stdio: FastMCP 서버 / 그 외: FastAPI HTTP 서버 (FastMCP는 stdio일 때만 로드)
+RUN_MODE = os.environ.get("RUN_MODE", "http")
 
 UPBIT     = "https://api.upbit.com/v1"
 BITHUMB   = "https://api.bithumb.com/public"
@@ -31,13 +46,47 @@ ALERT_KIMCHI_HIGH  = float(os.environ.get("ALERT_KIMCHI_HIGH", "3.0"))
 ALERT_KIMCHI_LOW   = float(os.environ.get("ALERT_KIMCHI_LOW", "-1.0"))
 ALERT_COINS        = os.environ.get("ALERT_COINS", "BTC,ETH,XRP").split(",")
 ALERT_INTERVAL_MIN = int(os.environ.get("ALERT_INTERVAL_MIN", "5"))
+# 여러 인스턴스(레플리카) 배포 시 한 곳만 모니터링하도록 끌 수 있음
+ALERT_MONITOR      = os.environ.get("ALERT_MONITOR", "on").lower() not in ("0", "false", "off")
+
+# 공유 HTTP 세션 (keep-alive 커넥션 풀 + DNS 캐시 재사용)
+CLIENT: aiohttp.ClientSession | None = None
+SLOW_REQUEST_SEC = float(os.environ.get("SLOW_REQUEST_SEC", "2.0"))
+_client_lock = asyncio.Lock()
+
+# 느리게 변하는 데이터용 TTL 캐시 (프로세스 내)
+FX_TTL_SEC      = int(os.environ.get("FX_TTL_SEC", "300"))
+MARKETS_TTL_SEC = 600
+REFRESH_BACKOFF_SEC = 30  # 갱신 실패 후 재시도까지 대기 (대기 중엔 직전 값/기본값 사용)
+_FX_CACHE: dict = {"value": None, "ts": 0.0, "failed_at": None}
+_MARKETS_CACHE: dict = {"data": None, "ts": 0.0, "failed_at": None, "error": None}
+_fx_lock = asyncio.Lock()
+_markets_lock = asyncio.Lock()
+
+# 동일 GET 요청 합치기 (single-flight) + 초단기 캐시
+TINY_CACHE_TTL_SEC = 1.5
+TINY_CACHE_MAX     = 512
+_INFLIGHT: dict[tuple, asyncio.Task] = {}
+_TINY_CACHE: dict[tuple, tuple[float, Any]] = {}
+_LAST_MOD: dict[tuple, tuple[str, Any]] = {}  # 조건부 GET용 (Last-Modified, 본문)
+
+# get_price 포맷 결과 캐시 (대시보드 폴링 대응)
+PRICE_CACHE_TTL_SEC = 1.0
+_PRICE_CACHE: dict[str, tuple[float, str]] = {}
+
+# 업비트 동시 요청 상한 (레이트리밋 보호)
+_upbit_sem = asyncio.Semaphore(4)
 
 # 알림 중복 방지 상태
-_last_alert: dict = {}
+# 알림 시각은 time.monotonic() 값, 표시할 때만 벽시계로 환산
+_last_alert: dict[str, float] = {}
+_WALL_OFFSET = time.time() - time.monotonic()
 _monitor_task = None
+_monitor_lock_fd = None
+_alert_tasks: set[asyncio.Task] = set()  # 발송 중인 알림 (GC 방지용 참조)
 
-# CoinGecko ID 매핑
-COINGECKO_IDS = {
+# CoinGecko ID 매핑 (읽기 전용)
+COINGECKO_IDS = types.MappingProxyType({sys.intern(k): sys.intern(v) for k, v in {
     "BTC": "bitcoin", "ETH": "ethereum", "XRP": "ripple",
     "SOL": "solana", "ADA": "cardano", "DOGE": "dogecoin",
     "AVAX": "avalanche-2", "DOT": "polkadot", "MATIC": "matic-network",
@@ -48,15 +97,155 @@ COINGECKO_IDS = {
     "SHIB": "shiba-inu", "PEPE": "pepe", "BNB": "binancecoin",
     "TON": "the-open-network", "STX": "blockstack",
     "SAND": "the-sandbox", "MANA": "decentraland",
-}
+}.items()})
+
+# 심볼 → CoinGecko ID 캐시 (검색 결과 포함, 미발견은 None — 1시간 후 재검색)
+# 사용자 입력이 키가 되므로 검색으로 추가된 항목은 TINY_CACHE_MAX개까지만 유지
+CG_MISS_TTL_SEC = 3600
+_CG_ID_CACHE: dict[str, str | None] = dict(COINGECKO_IDS)
+_CG_MISS_AT: dict[str, float] = {}
+_MISSING = object()
+
+# 업비트 change 필드 → 아이콘
+_CHANGE_ICON = {"RISE": "🟢", "FALL": "🔴", "EVEN": "⚪"}
+
+# 표 헤더 (고정 폭)
+_CANDLE_HEADER = (f"{'날짜':<18} {'시가':>12} {'고가':>12} {'저가':>12} {'종가':>12}\n"
+                  + "─" * 68)
+_MOVERS_HEADER = (f"{'#':<3} {'코인':<8} {'현재가':>12} {'변동률':>8} {'거래대금':>10}\n"
+                  + "─" * 47)
 
 
 # ── 유틸 ────────────────────────────────────────────
-async def get(url, params=None):
-    async with httpx.AsyncClient(timeout=10) as c:
-        r = await c.get(url, params=params)
+async def _on_request_start(session, ctx, params):
+    ctx.started_at = time.monotonic()
+
+
+async def _on_request_end(session, ctx, params: aiohttp.TraceRequestEndParams):
+    elapsed = time.monotonic() - ctx.started_at
+    if elapsed >= SLOW_REQUEST_SEC:
+        url = f"{params.url.host}{params.url.path}"
+        if TG_TOKEN:
+            url = url.replace(TG_TOKEN, "***")
+        # stdio 모드에서는 stdout이 MCP 전송로 → 로그는 항상 stderr로
+        print(f"[HTTP] 느린 응답 {elapsed:.2f}s — {params.method} {url}", file=sys.stderr)
+
+
+def _new_client() -> aiohttp.ClientSession:
+    trace = aiohttp.TraceConfig()
+    trace.on_request_start.append(_on_request_start)
+    trace.on_request_end.append(_on_request_end)
+    return aiohttp.ClientSession(
+        timeout=aiohttp.ClientTimeout(total=10),
+        connector=aiohttp.TCPConnector(limit=64, ttl_dns_cache=300, keepalive_timeout=30),
+        trace_configs=[trace],
+    )
+
+
+async def _get_client() -> aiohttp.ClientSession:
+    """HTTP 모드는 lifespan에서 생성, stdio 모드는 첫 호출 시 지연 생성"""
+    global CLIENT
+    if CLIENT is None:
+        async with _client_lock:
+            if CLIENT is None:
+                CLIENT = _new_client()
+    return CLIENT
+
+
+def _cache_key(url, params=None) -> tuple:
+    return (url, tuple(sorted((params or {}).items())))
+
+
+async def _fetch(url, params=None):
+    client = await _get_client()
+    # CoinGecko / 환율 API는 Last-Modified 기반 조건부 GET (304면 본문 없이 직전 응답 재사용)
+    conditional = url.startswith((COINGECKO, FX_URL))
+    key = _cache_key(url, params)
+    prev = _LAST_MOD.get(key) if conditional else None
+    headers = {"If-Modified-Since": prev[0]} if prev else None
+    async with client.get(url, params=params, headers=headers) as r:
+        if r.status == 304 and prev:
+            return prev[1]
         r.raise_for_status()
-        return r.json()
+        data = orjson.loads(await r.read())
+        last_modified = r.headers.get("Last-Modified")
+    if conditional and last_modified:
+        if key not in _LAST_MOD and len(_LAST_MOD) >= TINY_CACHE_MAX:
+            del _LAST_MOD[next(iter(_LAST_MOD))]
+        _LAST_MOD[key] = (last_modified, data)
+    return data
+
+
+def _store_result(key: tuple, task: asyncio.Task):
+    _INFLIGHT.pop(key, None)
+    if task.cancelled() or task.exception() is not None:
+        return
+    now = time.monotonic()
+    if len(_TINY_CACHE) >= TINY_CACHE_MAX:
+        for k in [k for k, (ts, _) in _TINY_CACHE.items() if now - ts >= TINY_CACHE_TTL_SEC]:
+            del _TINY_CACHE[k]
+    _TINY_CACHE[key] = (now, task.result())
+
+
+async def get(url, params=None):
+    """single-flight GET — 동일 요청은 진행 중인 결과를 공유하고 1.5초간 재사용"""
+    key = _cache_key(url, params)
+    hit = _TINY_CACHE.get(key)
+    if hit is not None and time.monotonic() - hit[0] < TINY_CACHE_TTL_SEC:
+        return hit[1]
+    task = _INFLIGHT.get(key)
+    if task is None:
+        task = asyncio.create_task(_fetch(url, params))
+        task.add_done_callback(lambda t: _store_result(key, t))
+        _INFLIGHT[key] = task
+    # 호출자 하나가 취소돼도 공유 요청은 계속 진행
+    return await asyncio.shield(task)
+
+
+def _cache_usable(cache: dict, key: str, ttl: float) -> bool:
+    """캐시가 TTL 이내이거나, 직전 갱신이 실패해 백오프 중이면 True (재요청하지 않음)"""
+    now = time.monotonic()
+    if cache[key] is not None and now - cache["ts"] < ttl:
+        return True
+    return cache["failed_at"] is not None and now - cache["failed_at"] < REFRESH_BACKOFF_SEC
+
+
+async def get_fx() -> float:
+    """USD/KRW 환율 (FX_TTL_SEC 캐시, 기본 5분). 조회 실패 시 직전 값 또는 1350.0"""
+    if not _cache_usable(_FX_CACHE, "value", FX_TTL_SEC):
+        async with _fx_lock:
+            # 앞선 대기자가 갱신했거나 실패했으면 그 결과를 그대로 사용
+            if not _cache_usable(_FX_CACHE, "value", FX_TTL_SEC):
+                try:
+                    fx = await get(FX_URL)
+                    _FX_CACHE["value"] = float(fx["rates"]["KRW"])
+                    _FX_CACHE["ts"] = time.monotonic()
+                    _FX_CACHE["failed_at"] = None
+                except Exception:
+                    _FX_CACHE["failed_at"] = time.monotonic()
+    return _FX_CACHE["value"] or 1350.0
+
+
+async def _cached_markets() -> dict[str, list[str]]:
+    """업비트 마켓 코드 목록 (10분 캐시). quote별로 미리 분류: {"KRW": ["KRW-BTC", ...], ...}
+    갱신 실패 시 직전 목록을 쓰고, 목록이 없으면 백오프 동안 같은 에러를 다시 던짐"""
+    if not _cache_usable(_MARKETS_CACHE, "data", MARKETS_TTL_SEC):
+        async with _markets_lock:
+            if not _cache_usable(_MARKETS_CACHE, "data", MARKETS_TTL_SEC):
+                try:
+                    data = await get(f"{UPBIT}/market/all", params={"isDetails": "false"})
+                    by_quote: dict[str, list[str]] = {}
+                    for m in data:
+                        by_quote.setdefault(m["market"].split("-", 1)[0], []).append(m["market"])
+                except Exception as e:
+                    _MARKETS_CACHE["failed_at"] = time.monotonic()
+                    _MARKETS_CACHE["error"] = e
+                else:
+                    _MARKETS_CACHE.update(data=by_quote, ts=time.monotonic(),
+                                          failed_at=None, error=None)
+    if _MARKETS_CACHE["data"] is None:
+        raise _MARKETS_CACHE["error"]
+    return _MARKETS_CACHE["data"]
 
 
 async def send_telegram(message: str) -> bool:
@@ -64,13 +253,13 @@ async def send_telegram(message: str) -> bool:
         return False
     try:
         url = f"https://api.telegram.org/bot{TG_TOKEN}/sendMessage"
-        async with httpx.AsyncClient(timeout=10) as c:
-            r = await c.post(url, json={
-                "chat_id": TG_CHAT_ID,
-                "text": message,
-                "parse_mode": "HTML"
-            })
-            return r.status_code == 200
+        client = await _get_client()
+        async with client.post(url, json={
+            "chat_id": TG_CHAT_ID,
+            "text": message,
+            "parse_mode": "HTML"
+        }) as r:
+            return r.status == 200
     except Exception:
         return False
 
@@ -79,98 +268,116 @@ def _can_alert(key: str, cooldown_minutes: int = 60) -> bool:
     last = _last_alert.get(key)
     if last is None:
         return True
-    return (datetime.now() - last).total_seconds() / 60 >= cooldown_minutes
+    return time.monotonic() - last >= cooldown_minutes * 60
 
 
 # ── MCP 도구 ──────────────────────────────────────────
-@mcp.tool()
 async def get_price(market: str) -> str:
     """업비트 실시간 현재가. 예: KRW-BTC 또는 KRW-BTC,KRW-ETH"""
-    data = await get(f"{UPBIT}/ticker", params={"markets": market.upper()})
-    lines = []
-    for d in data:
-        icon = "🟢" if d["change"] == "RISE" else ("🔴" if d["change"] == "FALL" else "⚪")
-        lines.append(
-            f"{icon} {d['market']}\n"
-            f"  현재가: {d['trade_price']:,.0f}원\n"
-            f"  전일대비: {d['signed_change_rate']*100:+.2f}% ({d['signed_change_price']:+,.0f}원)\n"
-            f"  고가: {d['high_price']:,.0f} / 저가: {d['low_price']:,.0f}\n"
-            f"  24h 거래대금: {d['acc_trade_price_24h']/1e8:.1f}억원"
-        )
-    return "\n\n".join(lines)
-
-
-@mcp.tool()
+    key = market.upper()
+    hit = _PRICE_CACHE.get(key)
+    if hit is not None and time.monotonic() - hit[0] < PRICE_CACHE_TTL_SEC:
+        return hit[1]
+    # 동시 미스는 get()의 single-flight로 업비트 요청 1회로 합쳐짐
+    data = await get(f"{UPBIT}/ticker", params={"markets": key})
+    text = "\n\n".join(
+        f"{_CHANGE_ICON.get(d['change'], '⚪')} {d['market']}\n"
+        f"  현재가: {d['trade_price']:,.0f}원\n"
+        f"  전일대비: {d['signed_change_rate']*100:+.2f}% ({d['signed_change_price']:+,.0f}원)\n"
+        f"  고가: {d['high_price']:,.0f} / 저가: {d['low_price']:,.0f}\n"
+        f"  24h 거래대금: {d['acc_trade_price_24h']/1e8:.1f}억원"
+        for d in data
+    )
+
+    now = time.monotonic()
+    if len(_PRICE_CACHE) >= TINY_CACHE_MAX:
+        for k in [k for k, (ts, _) in _PRICE_CACHE.items() if now - ts >= PRICE_CACHE_TTL_SEC]:
+            del _PRICE_CACHE[k]
+    _PRICE_CACHE[key] = (now, text)
+    return text
+
+
 async def get_markets(quote: str = "KRW") -> str:
     """업비트 마켓 목록. quote: KRW / BTC / USDT"""
-    data = await get(f"{UPBIT}/market/all", params={"isDetails": "false"})
-    filtered = [m for m in data if m["market"].startswith(quote.upper() + "-")]
-    coins = ", ".join([m["market"].split("-")[1] for m in filtered])
-    return f"업비트 {quote.upper()} 마켓 ({len(filtered)}개):\n{coins}"
+    quote = quote.upper()
+    n = len(quote) + 1
+    coins = [m[n:] for m in (await _cached_markets()).get(quote, [])]
+    return f"업비트 {quote} 마켓 ({len(coins)}개):\n{', '.join(coins)}"
 
 
-@mcp.tool()
 async def get_orderbook(market: str) -> str:
     """업비트 호가창. 예: KRW-BTC"""
-    data = await get(f"{UPBIT}/orderbook", params={"markets": market.upper()})
+    market = market.upper()
+    data = await get(f"{UPBIT}/orderbook", params={"markets": market})
     ob = data[0]
     units = ob["orderbook_units"][:5]
-    lines = [f"📊 {market.upper()} 호가창\n", "  [매도]"]
-    for u in reversed(units):
-        lines.append(f"  {u['ask_price']:>15,.0f}원  |  {u['ask_size']:.4f}")
-    lines.append("  ─────────────────────────")
-    for u in units:
-        lines.append(f"  {u['bid_price']:>15,.0f}원  |  {u['bid_size']:.4f}")
-    lines.append("  [매수]")
-    return "\n".join(lines)
+    asks = [f"  {u['ask_price']:>15,.0f}원  |  {u['ask_size']:.4f}" for u in units[::-1]]
+    bids = [f"  {u['bid_price']:>15,.0f}원  |  {u['bid_size']:.4f}" for u in units]
+    return "\n".join([f"📊 {market} 호가창\n", "  [매도]", *asks,
+                      "  ─────────────────────────", *bids, "  [매수]"])
 
 
-@mcp.tool()
 async def get_candles(market: str, interval: str = "days", count: int = 10) -> str:
     """업비트 캔들. interval: minutes/1, minutes/60, days, weeks, months"""
+    market = market.upper()
     data = await get(f"{UPBIT}/candles/{interval}",
-                     params={"market": market.upper(), "count": min(count, 200)})
-    lines = [f"🕯️ {market.upper()} ({interval}) {count}개\n",
-             f"{'날짜':<18} {'시가':>12} {'고가':>12} {'저가':>12} {'종가':>12}",
-             "─" * 68]
-    for c in data:
-        dt = c.get("candle_date_time_kst", "")[:16]
-        lines.append(f"{dt:<18} {c['opening_price']:>12,.0f} {c['high_price']:>12,.0f} "
-                     f"{c['low_price']:>12,.0f} {c['trade_price']:>12,.0f}")
-    return "\n".join(lines)
-
-
-@mcp.tool()
+                     params={"market": market, "count": min(count, 200)})
+    return "\n".join([
+        f"🕯️ {market} ({interval}) {count}개\n", _CANDLE_HEADER,
+        *(f"{c['candle_date_time_kst'][:16]:<18} {c['opening_price']:>12,.0f} {c['high_price']:>12,.0f} "
+          f"{c['low_price']:>12,.0f} {c['trade_price']:>12,.0f}" for c in data),
+    ])
+
+
+def _remember_cg_id(coin: str, cg_id: str | None):
+    """검색 결과를 캐시. 상한을 넘으면 가장 오래된 검색 항목부터 제거 (기본 매핑은 유지)"""
+    if coin not in _CG_ID_CACHE and len(_CG_ID_CACHE) - len(COINGECKO_IDS) >= TINY_CACHE_MAX:
+        oldest = next(k for k in _CG_ID_CACHE if k not in COINGECKO_IDS)
+        del _CG_ID_CACHE[oldest]
+        _CG_MISS_AT.pop(oldest, None)
+    _CG_ID_CACHE[coin] = cg_id
+    if cg_id is None:
+        _CG_MISS_AT[coin] = time.monotonic()
+    else:
+        _CG_MISS_AT.pop(coin, None)
+
+
 async def get_kimchi_premium(coin: str) -> str:
     """김치프리미엄 계산. 업비트 vs CoinGecko(글로벌). 예: BTC"""
     coin = coin.upper()
-    upbit_data = await get(f"{UPBIT}/ticker", params={"markets": f"KRW-{coin}"})
-    krw_price = upbit_data[0]["trade_price"]
-
-    cg_id = COINGECKO_IDS.get(coin)
-    if not cg_id:
+    cg_id = _CG_ID_CACHE.get(coin, _MISSING)
+    if cg_id is None and time.monotonic() - _CG_MISS_AT[coin] >= CG_MISS_TTL_SEC:
+        del _CG_ID_CACHE[coin], _CG_MISS_AT[coin]
+        cg_id = _MISSING
+    if cg_id is _MISSING:
         try:
             search = await get(f"{COINGECKO}/search", params={"query": coin})
             coins_list = search.get("coins", [])
-            if not coins_list:
-                return f"CoinGecko에서 {coin} 정보를 찾을 수 없습니다."
-            cg_id = coins_list[0]["id"]
+            cg_id = coins_list[0]["id"] if coins_list else None
+            _remember_cg_id(coin, cg_id)
         except Exception:
             return f"CoinGecko에서 {coin} 정보를 가져오지 못했습니다."
+    if cg_id is None:
+        return f"CoinGecko에서 {coin} 정보를 찾을 수 없습니다."
+
+    # 업비트 / CoinGecko / 환율은 서로 독립 → 동시 요청
+    upbit_data, cg_data, usd_krw = await asyncio.gather(
+        get(f"{UPBIT}/ticker", params={"markets": f"KRW-{coin}"}),
+        get(f"{COINGECKO}/simple/price", params={"ids": cg_id, "vs_currencies": "usd"}),
+        get_fx(),
+        return_exceptions=True,
+    )
+    if isinstance(upbit_data, Exception):
+        raise upbit_data
+    krw_price = upbit_data[0]["trade_price"]
 
     try:
-        cg_data = await get(f"{COINGECKO}/simple/price",
-                            params={"ids": cg_id, "vs_currencies": "usd"})
+        if isinstance(cg_data, Exception):
+            raise cg_data
         usd_price = cg_data[cg_id]["usd"]
     except Exception:
         return f"CoinGecko에서 {coin}({cg_id}) 가격을 가져오지 못했습니다."
 
-    try:
-        fx = await get(FX_URL)
-        usd_krw = fx["rates"]["KRW"]
-    except Exception:
-        usd_krw = 1350.0
-
     krw_equiv = usd_price * usd_krw
     pct = (krw_price - krw_equiv) / krw_equiv * 100
     emoji = "🌶️" if pct > 3 else ("🔵" if pct < -1 else "⚖️")
@@ -189,14 +396,20 @@ async def get_kimchi_premium(coin: str) -> str:
     )
 
 
-@mcp.tool()
 async def compare_exchanges(coin: str) -> str:
     """업비트 vs 빗썸 가격 비교. 예: BTC"""
     coin = coin.upper()
-    upbit_data = await get(f"{UPBIT}/ticker", params={"markets": f"KRW-{coin}"})
+    upbit_data, bithumb_data = await asyncio.gather(
+        get(f"{UPBIT}/ticker", params={"markets": f"KRW-{coin}"}),
+        get(f"{BITHUMB}/ticker/{coin}_KRW"),
+        return_exceptions=True,
+    )
+    if isinstance(upbit_data, Exception):
+        raise upbit_data
     upbit_price = upbit_data[0]["trade_price"]
     try:
-        bithumb_data = await get(f"{BITHUMB}/ticker/{coin}_KRW")
+        if isinstance(bithumb_data, Exception):
+            raise bithumb_data
         bithumb_price = float(bithumb_data["data"]["closing_price"])
     except Exception:
         return f"빗썸에서 {coin} 데이터를 가져오지 못했습니다."
@@ -212,190 +425,366 @@ async def compare_exchanges(coin: str) -> str:
     )
 
 
-@mcp.tool()
 async def get_top_movers(direction: str = "up", limit: int = 10) -> str:
     """상승/하락 상위 코인. direction: up / down"""
-    markets_data = await get(f"{UPBIT}/market/all", params={"isDetails": "false"})
-    krw_markets = [m["market"] for m in markets_data if m["market"].startswith("KRW-")]
-    all_tickers = []
-    for i in range(0, len(krw_markets), 100):
-        chunk = krw_markets[i:i+100]
-        tickers = await get(f"{UPBIT}/ticker", params={"markets": ",".join(chunk)})
-        all_tickers.extend(tickers)
-    sorted_t = sorted(all_tickers, key=lambda x: x["signed_change_rate"], reverse=(direction == "up"))
-    top = sorted_t[:limit]
+    krw_markets = (await _cached_markets()).get("KRW", [])
+    chunks = [krw_markets[i:i+100] for i in range(0, len(krw_markets), 100)]
+
+    async def fetch(chunk):
+        async with _upbit_sem:
+            return await get(f"{UPBIT}/ticker", params={"markets": ",".join(chunk)})
+
+    # 일부 청크 실패는 건너뛰고, 전부 실패한 경우에만 에러
+    results = await asyncio.gather(*(fetch(c) for c in chunks), return_exceptions=True)
+    ok = [r for r in results if not isinstance(r, Exception)]
+    if results and not ok:
+        raise results[0]
+    all_tickers = [t for r in ok for t in r]
+    key = itemgetter("signed_change_rate")
+    top = (heapq.nlargest(limit, all_tickers, key=key) if direction == "up"
+           else heapq.nsmallest(limit, all_tickers, key=key))
     title = f"🚀 상승률 TOP {limit}" if direction == "up" else f"📉 하락률 TOP {limit}"
-    lines = [f"{title} (24h)\n",
-             f"{'#':<3} {'코인':<8} {'현재가':>12} {'변동률':>8} {'거래대금':>10}",
-             "─" * 47]
-    for i, t in enumerate(top, 1):
-        coin = t["market"].replace("KRW-", "")
-        icon = "🟢" if t["change"] == "RISE" else "🔴"
-        lines.append(f"{i:<3} {icon}{coin:<6} {t['trade_price']:>12,.0f} "
-                     f"{t['signed_change_rate']*100:>+7.2f}% {t['acc_trade_price_24h']/1e8:>8.1f}억")
-    return "\n".join(lines)
+    return "\n".join([
+        f"{title} (24h)\n", _MOVERS_HEADER,
+        *(f"{i:<3} {'🟢' if t['change'] == 'RISE' else '🔴'}{t['market'][4:]:<6} {t['trade_price']:>12,.0f} "
+          f"{t['signed_change_rate']*100:>+7.2f}% {t['acc_trade_price_24h']/1e8:>8.1f}억"
+          for i, t in enumerate(top, 1)),
+    ])
+
+
+TOOLS = (get_price, get_markets, get_orderbook, get_candles,
+         get_kimchi_premium, compare_exchanges, get_top_movers)
 
 
 # ── 텔레그램 모니터링 ────────────────────────────────
-async def _get_kimchi_pct(coin: str) -> float | None:
+async def _get_kimchi_batch(coins: list[str], tag: str | None = "[Monitor]") -> dict[str, float]:
+    """여러 코인의 김치프리미엄(%)을 업비트 / CoinGecko / 환율 각 1회 요청으로 계산
+    업비트 KRW 마켓에 없는 코인은 제외하고, 묶음 요청이 실패하면 코인별로 재시도
+    tag: 로그 접두어 (None이면 로그 생략 — 요청 경로는 호출자가 실패를 응답으로 알림)"""
+    def log(msg: str):
+        if tag:
+            print(f"{tag} {msg}")
+
+    cg_ids = {c: _CG_ID_CACHE.get(c) for c in coins}
+    cg_ids = {c: i for c, i in cg_ids.items() if i}
     try:
-        coin = coin.upper()
-        upbit_data = await get(f"{UPBIT}/ticker", params={"markets": f"KRW-{coin}"})
-        krw_price = upbit_data[0]["trade_price"]
-        cg_id = COINGECKO_IDS.get(coin)
-        if not cg_id:
-            return None
-        cg_data = await get(f"{COINGECKO}/simple/price",
-                            params={"ids": cg_id, "vs_currencies": "usd"})
-        usd_price = cg_data[cg_id]["usd"]
-        try:
-            fx = await get(FX_URL)
-            usd_krw = fx["rates"]["KRW"]
-        except Exception:
-            usd_krw = 1350.0
-        return (krw_price - usd_price * usd_krw) / (usd_price * usd_krw) * 100
+        krw_markets = set((await _cached_markets()).get("KRW", []))
     except Exception:
-        return None
+        krw_markets = None  # 목록 조회 실패 시 필터 없이 진행 (실패하면 코인별 재시도)
+    if krw_markets is not None:
+        unknown = [c for c in cg_ids if f"KRW-{c}" not in krw_markets]
+        if unknown:
+            log(f"업비트 KRW 마켓에 없는 코인 제외: {', '.join(unknown)}")
+            cg_ids = {c: i for c, i in cg_ids.items() if c not in unknown}
+    if not cg_ids:
+        return {}
+    upbit_data, cg_data, usd_krw = await asyncio.gather(
+        get(f"{UPBIT}/ticker", params={"markets": ",".join(f"KRW-{c}" for c in cg_ids)}),
+        get(f"{COINGECKO}/simple/price",
+            params={"ids": ",".join(dict.fromkeys(cg_ids.values())), "vs_currencies": "usd"}),
+        get_fx(),
+        return_exceptions=True,
+    )
+    if isinstance(cg_data, Exception):
+        log(f"CoinGecko 조회 실패: {cg_data!r}")
+        return {}
+    if isinstance(upbit_data, Exception):
+        log(f"업비트 묶음 조회 실패 — 코인별 재시도: {upbit_data!r}")
+
+        async def fetch(coin):
+            async with _upbit_sem:
+                return await get(f"{UPBIT}/ticker", params={"markets": f"KRW-{coin}"})
+
+        results = await asyncio.gather(*(fetch(c) for c in cg_ids), return_exceptions=True)
+        upbit_data = [t for r in results if not isinstance(r, Exception) for t in r]
+    try:
+        krw_prices = {t["market"][4:]: t["trade_price"] for t in upbit_data}
+        usd_prices = {c: cg_data.get(i, {}).get("usd") for c, i in cg_ids.items()}
+        return {c: (krw_prices[c] - usd_prices[c] * usd_krw) / (usd_prices[c] * usd_krw) * 100
+                for c in cg_ids if c in krw_prices and usd_prices[c]}
+    except Exception as e:
+        log(f"시세 응답 해석 실패: {e!r}")
+        return {}
+
+
+async def _get_kimchi_pct(coin: str) -> float | None:
+    coin = coin.upper()
+    return (await _get_kimchi_batch([coin], tag=None)).get(coin)
+
+
+def _send_alert(key: str, message: str, log: str):
+    """텔레그램 알림을 백그라운드로 발송. 쿨다운은 먼저 기록하고 실패하면 되돌림"""
+    prev = _last_alert.get(key)
+    stamp = _last_alert[key] = time.monotonic()
+    task = asyncio.create_task(send_telegram(message))
+    _alert_tasks.add(task)
+
+    def done(t: asyncio.Task):
+        _alert_tasks.discard(t)
+        if not t.cancelled() and t.result():
+            print(log)
+        elif _last_alert.get(key) == stamp:
+            if prev is None:
+                del _last_alert[key]
+            else:
+                _last_alert[key] = prev
+
+    task.add_done_callback(done)
 
 
 async def monitor_loop():
     await asyncio.sleep(10)
     print(f"[Monitor] 시작 — {ALERT_INTERVAL_MIN}분 간격 | 코인: {ALERT_COINS}")
+    coins = [c.strip().upper() for c in ALERT_COINS]
     while True:
-        now_str = datetime.now().strftime("%H:%M")
-        for coin in ALERT_COINS:
-            coin = coin.strip().upper()
-            pct = await _get_kimchi_pct(coin)
-            if pct is None:
-                continue
-
-            if pct >= ALERT_KIMCHI_HIGH:
-                key = f"{coin}_high"
-                if _can_alert(key):
-                    sent = await send_telegram(
-                        f"🌶️ <b>김치프리미엄 알림</b> [{now_str}]\n\n"
-                        f"코인: <b>{coin}</b>\n"
-                        f"프리미엄: <b>{pct:+.2f}%</b> (기준: {ALERT_KIMCHI_HIGH}%↑)\n\n"
-                        f"📌 한국 고평가 — 아비트리지 기회 가능"
-                    )
-                    if sent:
-                        _last_alert[key] = datetime.now()
-                        print(f"[Alert] {coin} 🌶️ {pct:+.2f}%")
-
-            elif pct <= ALERT_KIMCHI_LOW:
-                key = f"{coin}_low"
-                if _can_alert(key):
-                    sent = await send_telegram(
-                        f"🔵 <b>역프리미엄 알림</b> [{now_str}]\n\n"
-                        f"코인: <b>{coin}</b>\n"
-                        f"역프리미엄: <b>{pct:+.2f}%</b> (기준: {ALERT_KIMCHI_LOW}%↓)\n\n"
-                        f"📌 국내 저평가 — 해외→국내 기회 가능"
-                    )
-                    if sent:
-                        _last_alert[key] = datetime.now()
-                        print(f"[Alert] {coin} 🔵 {pct:+.2f}%")
+        try:
+            now_str = datetime.now().strftime("%H:%M")
+            pct_map = await _get_kimchi_batch(coins)
+            for coin, pct in pct_map.items():
+                if pct >= ALERT_KIMCHI_HIGH:
+                    key = f"{coin}_high"
+                    if _can_alert(key):
+                        _send_alert(
+                            key,
+                            f"🌶️ <b>김치프리미엄 알림</b> [{now_str}]\n\n"
+                            f"코인: <b>{coin}</b>\n"
+                            f"프리미엄: <b>{pct:+.2f}%</b> (기준: {ALERT_KIMCHI_HIGH}%↑)\n\n"
+                            f"📌 한국 고평가 — 아비트리지 기회 가능",
+                            f"[Alert] {coin} 🌶️ {pct:+.2f}%",
+                        )
+
+                elif pct <= ALERT_KIMCHI_LOW:
+                    key = f"{coin}_low"
+                    if _can_alert(key):
+                        _send_alert(
+                            key,
+                            f"🔵 <b>역프리미엄 알림</b> [{now_str}]\n\n"
+                            f"코인: <b>{coin}</b>\n"
+                            f"역프리미엄: <b>{pct:+.2f}%</b> (기준: {ALERT_KIMCHI_LOW}%↓)\n\n"
+                            f"📌 국내 저평가 — 해외→국내 기회 가능",
+                            f"[Alert] {coin} 🔵 {pct:+.2f}%",
+                        )
+
+            # 쿨다운(60분)의 2배가 지난 알림 기록은 정리
+            cutoff = time.monotonic() - 2 * 60 * 60
+            for key in [k for k, v in _last_alert.items() if v < cutoff]:
+                del _last_alert[key]
+        except Exception as e:
+            # 한 사이클 실패로 모니터가 멈추지 않도록
+            print(f"[Monitor] 체크 실패: {e!r}")
 
         await asyncio.sleep(ALERT_INTERVAL_MIN * 60)
 
 
+def _claim_monitor() -> bool:
+    """멀티 워커 중 한 프로세스만 모니터링하도록 파일 락 선점 (프로세스 종료 시 해제)"""
+    global _monitor_lock_fd
+    if fcntl is None:
+        return True
+    try:
+        path = os.path.join(tempfile.gettempdir(), f"korean-crypto-monitor-{os.getuid()}.lock")
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+    except OSError as e:
+        print(f"[Monitor] 락 파일을 열 수 없어 모니터링 생략: {e!r}")
+        return False
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(fd)
+        return False
+    _monitor_lock_fd = fd
+    return True
+
+
 # ── FastAPI (lifespan) ───────────────────────────────
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global _monitor_task
+    global CLIENT, _monitor_task
+    CLIENT = _new_client()
     if TG_TOKEN and TG_CHAT_ID:
-        _monitor_task = asyncio.create_task(monitor_loop())
-        print("[Server] ✅ 텔레그램 모니터링 활성")
+        if not ALERT_MONITOR:
+            print("[Server] ℹ️  텔레그램 모니터링 비활성 (ALERT_MONITOR=off)")
+        elif _claim_monitor():
+            _monitor_task = asyncio.create_task(monitor_loop())
+            print("[Server] ✅ 텔레그램 모니터링 활성")
+        else:
+            print("[Server] ℹ️  텔레그램 모니터링은 다른 워커에서 실행 중")
     else:
         print("[Server] ⚠️  텔레그램 미설정 — 환경변수 확인")
     yield
     if _monitor_task:
         _monitor_task.cancel()
+    await CLIENT.close()
+    CLIENT = None
+
+
+class ORJSONResponse(JSONResponse):
+    """orjson 직렬화 응답 (stdlib json 대비 빠름)"""
+    def render(self, content) -> bytes:
+        return orjson.dumps(content)
 
 
 app = FastAPI(
     title="Korean Crypto MCP API v4",
     description="업비트 실시간 데이터 + 텔레그램 알림봇",
     version="4.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
+# 읽기 전용 공개 API — 사용하는 메서드만 허용, 프리플라이트는 하루 캐시
 app.add_middleware(CORSMiddleware, allow_origins=["*"],
-                   allow_methods=["*"], allow_headers=["*"])
+                   allow_methods=["GET", "POST"], allow_headers=["*"],
+                   max_age=86400)
 
 
 # ── REST 엔드포인트 ──────────────────────────────────
+# 고정 응답은 시작 시 한 번만 직렬화 (환경변수는 임포트 시점 값 사용)
+_ROOT_BYTES = orjson.dumps({
+    "name": "korean-crypto-mcp", "version": "4.0.0", "status": "running",
+    "telegram_enabled": bool(TG_TOKEN and TG_CHAT_ID),
+    "alert_coins": ALERT_COINS,
+    "alert_threshold": {"high": ALERT_KIMCHI_HIGH, "low": ALERT_KIMCHI_LOW},
+    "tools": ["get_price","get_markets","get_orderbook","get_candles",
+              "get_kimchi_premium","compare_exchanges","get_top_movers"]
+})
+_HEALTH_BYTES = orjson.dumps({"status": "ok", "version": "4.0.0"})
+
+
 @app.get("/")
 async def root():
-    return {
-        "name": "korean-crypto-mcp", "version": "4.0.0", "status": "running",
-        "telegram_enabled": bool(TG_TOKEN and TG_CHAT_ID),
-        "alert_coins": ALERT_COINS,
-        "alert_threshold": {"high": ALERT_KIMCHI_HIGH, "low": ALERT_KIMCHI_LOW},
-        "tools": ["get_price","get_markets","get_orderbook","get_candles",
-                  "get_kimchi_premium","compare_exchanges","get_top_movers"]
-    }
+    return Response(content=_ROOT_BYTES, media_type="application/json")
 
 @app.get("/health")
 async def health():
-    return {"status": "ok", "version": "4.0.0"}
+    return Response(content=_HEALTH_BYTES, media_type="application/json")
 
 
 # ── Smithery / MCP HTTP 엔드포인트 ──────────────────
+_MCP_INFO = {
+    "protocol": "mcp",
+    "version": "2024-11-05",
+    "name": "korean-crypto-mcp",
+    "description": "한국 암호화폐 실시간 데이터 (업비트, 김치프리미엄, 빗썸)",
+    "tools": [
+        {"name": "get_price",
+         "description": "업비트 실시간 현재가. 예: KRW-BTC",
+         "inputSchema": {"type": "object", "properties": {
+             "market": {"type": "string", "description": "마켓 코드. 예: KRW-BTC"}},
+             "required": ["market"]}},
+        {"name": "get_kimchi_premium",
+         "description": "김치프리미엄 계산 (업비트 vs CoinGecko). 예: BTC",
+         "inputSchema": {"type": "object", "properties": {
+             "coin": {"type": "string", "description": "코인 심볼. 예: BTC"}},
+             "required": ["coin"]}},
+        {"name": "get_top_movers",
+         "description": "24h 상승/하락 상위 코인",
+         "inputSchema": {"type": "object", "properties": {
+             "direction": {"type": "string", "enum": ["up", "down"], "default": "up"},
+             "limit": {"type": "integer", "default": 10}}}},
+        {"name": "compare_exchanges",
+         "description": "업비트 vs 빗썸 가격 비교. 예: BTC",
+         "inputSchema": {"type": "object", "properties": {
+             "coin": {"type": "string", "description": "코인 심볼. 예: BTC"}},
+             "required": ["coin"]}},
+        {"name": "get_orderbook",
+         "description": "업비트 호가창. 예: KRW-BTC",
+         "inputSchema": {"type": "object", "properties": {
+             "market": {"type": "string", "description": "마켓 코드. 예: KRW-BTC"}},
+             "required": ["market"]}},
+        {"name": "get_candles",
+         "description": "업비트 캔들 데이터",
+         "inputSchema": {"type": "object", "properties": {
+             "market": {"type": "string"},
+             "interval": {"type": "string", "default": "days"},
+             "count": {"type": "integer", "default": 10}},
+             "required": ["market"]}},
+        {"name": "get_markets",
+         "description": "업비트 마켓 목록",
+         "inputSchema": {"type": "object", "properties": {
+             "quote": {"type": "string", "default": "KRW"}}}}
+    ]
+}
+_MCP_INFO_BYTES = orjson.dumps(_MCP_INFO)
+
+
 @app.get("/mcp")
 async def mcp_info():
     """Smithery MCP 엔드포인트 — 서버 정보 및 툴 목록"""
-    return {
-        "protocol": "mcp",
-        "version": "2024-11-05",
-        "name": "korean-crypto-mcp",
-        "description": "한국 암호화폐 실시간 데이터 (업비트, 김치프리미엄, 빗썸)",
-        "tools": [
-            {"name": "get_price",
-             "description": "업비트 실시간 현재가. 예: KRW-BTC",
-             "inputSchema": {"type": "object", "properties": {
-                 "market": {"type": "string", "description": "마켓 코드. 예: KRW-BTC"}},
-                 "required": ["market"]}},
-            {"name": "get_kimchi_premium",
-             "description": "김치프리미엄 계산 (업비트 vs CoinGecko). 예: BTC",
-             "inputSchema": {"type": "object", "properties": {
-                 "coin": {"type": "string", "description": "코인 심볼. 예: BTC"}},
-                 "required": ["coin"]}},
-            {"name": "get_top_movers",
-             "description": "24h 상승/하락 상위 코인",
-             "inputSchema": {"type": "object", "properties": {
-                 "direction": {"type": "string", "enum": ["up", "down"], "default": "up"},
-                 "limit": {"type": "integer", "default": 10}}}},
-            {"name": "compare_exchanges",
-             "description": "업비트 vs 빗썸 가격 비교. 예: BTC",
-             "inputSchema": {"type": "object", "properties": {
-                 "coin": {"type": "string", "description": "코인 심볼. 예: BTC"}},
-                 "required": ["coin"]}},
-            {"name": "get_orderbook",
-             "description": "업비트 호가창. 예: KRW-BTC",
-             "inputSchema": {"type": "object", "properties": {
-                 "market": {"type": "string", "description": "마켓 코드. 예: KRW-BTC"}},
-                 "required": ["market"]}},
-            {"name": "get_candles",
-             "description": "업비트 캔들 데이터",
-             "inputSchema": {"type": "object", "properties": {
-                 "market": {"type": "string"},
-                 "interval": {"type": "string", "default": "days"},
-                 "count": {"type": "integer", "default": 10}},
-                 "required": ["market"]}},
-            {"name": "get_markets",
-             "description": "업비트 마켓 목록",
-             "inputSchema": {"type": "object", "properties": {
-                 "quote": {"type": "string", "default": "KRW"}}}}
-        ]
-    }
+    return Response(content=_MCP_INFO_BYTES, media_type="application/json")
+
+
+# ── 요청 모델 ─────────────────────────────────────────
+class _Body(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
+
+class MarketArgs(_Body):
+    market: str = "KRW-BTC"
+
+
+class CoinArgs(_Body):
+    coin: str = "BTC"
+
+
+class CandlesArgs(_Body):
+    market: str = "KRW-BTC"
+    interval: str = "days"
+    count: int = 10
+
+
+class TopMoversArgs(_Body):
+    direction: str = "up"
+    limit: int = 10
+
+
+class MarketsArgs(_Body):
+    quote: str = "KRW"
+
+
+# 본문은 Any로 받고 핸들러 안에서 검증 — 형식 오류도 JSON-RPC 에러로 응답
+class McpParams(_Body):
+    name: str = ""
+    arguments: dict[str, Any] | None = None
+
+
+class McpCall(_Body):
+    method: str = ""
+    params: Any = None
+
+
+class TaskPart(_Body):
+    type: str = ""
+    text: str | None = ""
+
+
+class TaskMessage(_Body):
+    parts: list[TaskPart] = []
+
+
+class TaskSend(_Body):
+    id: Any = "task-1"
+    skillId: str = "get_price"
+    message: TaskMessage | None = None
+    metadata: dict[str, Any] | None = None
+
+
+# tools/call 디스패치: 도구명 → (함수, 인자 모델)
+_TOOL_DISPATCH = {
+    "get_price":          (get_price, MarketArgs),
+    "get_kimchi_premium": (get_kimchi_premium, CoinArgs),
+    "get_top_movers":     (get_top_movers, TopMoversArgs),
+    "compare_exchanges":  (compare_exchanges, CoinArgs),
+    "get_orderbook":      (get_orderbook, MarketArgs),
+    "get_candles":        (get_candles, CandlesArgs),
+    "get_markets":        (get_markets, MarketsArgs),
+}
 
 
 @app.post("/mcp")
-async def mcp_call(request: dict):
+async def mcp_call(payload: Any = Body(None)):
     """Smithery 표준 JSON-RPC MCP 엔드포인트"""
-    jsonrpc_id = request.get("id", 1)
-    method = request.get("method", "")
-    params = request.get("params", {}) or {}
+    jsonrpc_id = payload.get("id", 1) if isinstance(payload, dict) else None
 
     def ok(result):
         return {"jsonrpc": "2.0", "id": jsonrpc_id, "result": result}
@@ -404,6 +793,12 @@ async def mcp_call(request: dict):
         return {"jsonrpc": "2.0", "id": jsonrpc_id,
                 "error": {"code": code, "message": message}}
 
+    try:
+        req = McpCall.model_validate(payload)
+    except ValidationError:
+        return err(-32600, "Invalid Request")
+    method = req.method
+
     # ── initialize ───────────────────────────────────
     if method == "initialize":
         return ok({
@@ -418,29 +813,24 @@ async def mcp_call(request: dict):
 
     # ── tools/list ───────────────────────────────────
     if method == "tools/list":
-        info = await mcp_info()
-        return ok({"tools": info["tools"]})
+        return ok({"tools": _MCP_INFO["tools"]})
 
     # ── tools/call ───────────────────────────────────
     if method == "tools/call":
-        tool_name = params.get("name", "")
-        args = params.get("arguments", {}) or {}
         try:
-            dispatch = {
-                "get_price":          lambda: get_price(args.get("market", "KRW-BTC")),
-                "get_kimchi_premium": lambda: get_kimchi_premium(args.get("coin", "BTC")),
-                "get_top_movers":     lambda: get_top_movers(args.get("direction", "up"),
-                                                              int(args.get("limit", 10))),
-                "compare_exchanges":  lambda: compare_exchanges(args.get("coin", "BTC")),
-                "get_orderbook":      lambda: get_orderbook(args.get("market", "KRW-BTC")),
-                "get_candles":        lambda: get_candles(args.get("market", "KRW-BTC"),
-                                                           args.get("interval", "days"),
-                                                           int(args.get("count", 10))),
-                "get_markets":        lambda: get_markets(args.get("quote", "KRW")),
-            }
-            if tool_name not in dispatch:
-                return err(-32601, f"Unknown tool: {tool_name}")
-            result = await dispatch[tool_name]()
+            params = McpParams.model_validate(req.params or {})
+        except ValidationError as e:
+            return err(-32602, f"Invalid params: {e.errors()[0]['msg']}")
+        tool_name = params.name
+        if tool_name not in _TOOL_DISPATCH:
+            return err(-32601, f"Unknown tool: {tool_name}")
+        func, model = _TOOL_DISPATCH[tool_name]
+        try:
+            args = model.model_validate(params.arguments or {})
+        except ValidationError as e:
+            return err(-32602, f"Invalid arguments: {e.errors()[0]['msg']}")
+        try:
+            result = await func(**dict(args))
             return ok({"content": [{"type": "text", "text": result}]})
         except Exception as e:
             return err(-32603, str(e))
@@ -499,14 +889,17 @@ async def alert_test():
 
 @app.get("/alert/status")
 async def alert_status():
-    """알림 상태 확인"""
+    """알림 상태 확인 (모니터 상태와 알림 기록은 응답한 워커 기준 — 멀티 워커면 monitor_owner 확인)"""
     return {
         "telegram_enabled": bool(TG_TOKEN and TG_CHAT_ID),
         "monitor_running": _monitor_task is not None and not _monitor_task.done(),
+        "monitor_owner": _monitor_task is not None,
+        "worker_pid": os.getpid(),
         "alert_coins": ALERT_COINS,
         "thresholds": {"high_pct": ALERT_KIMCHI_HIGH, "low_pct": ALERT_KIMCHI_LOW},
         "interval_minutes": ALERT_INTERVAL_MIN,
-        "last_alerts": {k: v.strftime("%Y-%m-%d %H:%M:%S") for k, v in _last_alert.items()}
+        "last_alerts": {k: datetime.fromtimestamp(_WALL_OFFSET + v).strftime("%Y-%m-%d %H:%M:%S")
+                        for k, v in _last_alert.items()}
     }
 
 
@@ -525,46 +918,61 @@ async def alert_now(coin: str):
 
 
 # ── A2A ─────────────────────────────────────────────
+_AGENT_URL = os.environ.get("RAILWAY_PUBLIC_DOMAIN", "localhost:8000")
+if not _AGENT_URL.startswith("http"):
+    _AGENT_URL = f"https://{_AGENT_URL}"
+_AGENT_BYTES = orjson.dumps({
+    "name": "korean-crypto-mcp", "version": "4.0.0",
+    "description": "한국 암호화폐 실시간 데이터 + 텔레그램 알림 에이전트",
+    "url": _AGENT_URL,
+    "capabilities": {"streaming": False, "pushNotifications": True},
+    "skills": [
+        {"id": "get_price", "name": "실시간 현재가", "inputModes": ["text"], "outputModes": ["text"]},
+        {"id": "get_kimchi_premium", "name": "김치프리미엄", "inputModes": ["text"], "outputModes": ["text"]},
+        {"id": "get_top_movers", "name": "상승/하락 TOP", "inputModes": ["text"], "outputModes": ["text"]},
+        {"id": "compare_exchanges", "name": "거래소 비교", "inputModes": ["text"], "outputModes": ["text"]}
+    ]
+})
+
+
 @app.get("/.well-known/agent.json")
 async def agent_card():
-    base_url = os.environ.get("RAILWAY_PUBLIC_DOMAIN", "localhost:8000")
-    if not base_url.startswith("http"):
-        base_url = f"https://{base_url}"
-    return {
-        "name": "korean-crypto-mcp", "version": "4.0.0",
-        "description": "한국 암호화폐 실시간 데이터 + 텔레그램 알림 에이전트",
-        "url": base_url,
-        "capabilities": {"streaming": False, "pushNotifications": True},
-        "skills": [
-            {"id": "get_price", "name": "실시간 현재가", "inputModes": ["text"], "outputModes": ["text"]},
-            {"id": "get_kimchi_premium", "name": "김치프리미엄", "inputModes": ["text"], "outputModes": ["text"]},
-            {"id": "get_top_movers", "name": "상승/하락 TOP", "inputModes": ["text"], "outputModes": ["text"]},
-            {"id": "compare_exchanges", "name": "거래소 비교", "inputModes": ["text"], "outputModes": ["text"]}
-        ]
-    }
+    return Response(content=_AGENT_BYTES, media_type="application/json")
+
+
+# A2A 스킬 디스패치: 스킬 ID → (함수, 인자 모델, 텍스트로 채울 필드)
+_SKILL_DISPATCH = {
+    "get_price":          (get_price, MarketArgs, "market"),
+    "get_markets":        (get_markets, MarketsArgs, None),
+    "get_orderbook":      (get_orderbook, MarketArgs, None),
+    "get_candles":        (get_candles, CandlesArgs, None),
+    "get_kimchi_premium": (get_kimchi_premium, CoinArgs, "coin"),
+    "compare_exchanges":  (compare_exchanges, CoinArgs, "coin"),
+    "get_top_movers":     (get_top_movers, TopMoversArgs, None),
+}
 
 
 @app.post("/tasks/send")
-async def tasks_send(request: dict):
+async def tasks_send(payload: Any = Body(None)):
+    try:
+        req = TaskSend.model_validate(payload)
+    except ValidationError as e:
+        raise HTTPException(400, f"Invalid task: {e.errors()[0]['msg']}")
+    if req.skillId not in _SKILL_DISPATCH:
+        raise HTTPException(400, f"Unknown skill: {req.skillId}")
+    func, model, text_field = _SKILL_DISPATCH[req.skillId]
+    parts = req.message.parts if req.message else []
+    text = next((p.text for p in parts if p.type == "text"), "") or ""
+    meta = req.metadata or {}
+    if text_field and text:
+        meta = {text_field: text, **meta}
+    try:
+        args = model.model_validate(meta)
+    except ValidationError as e:
+        raise HTTPException(400, f"Invalid arguments: {e.errors()[0]['msg']}")
     try:
-        parts = request.get("message", {}).get("parts", [])
-        text = next((p.get("text", "") for p in parts if p.get("type") == "text"), "")
-        skill_id = request.get("skillId", "get_price")
-        meta = request.get("metadata", {})
-        dispatch = {
-            "get_price":          lambda: get_price(meta.get("market", text or "KRW-BTC")),
-            "get_markets":        lambda: get_markets(meta.get("quote", "KRW")),
-            "get_orderbook":      lambda: get_orderbook(meta.get("market", "KRW-BTC")),
-            "get_candles":        lambda: get_candles(meta.get("market","KRW-BTC"),
-                                                       meta.get("interval","days"), int(meta.get("count",10))),
-            "get_kimchi_premium": lambda: get_kimchi_premium(meta.get("coin", text or "BTC")),
-            "compare_exchanges":  lambda: compare_exchanges(meta.get("coin", text or "BTC")),
-            "get_top_movers":     lambda: get_top_movers(meta.get("direction","up"), int(meta.get("limit",10))),
-        }
-        if skill_id not in dispatch:
-            raise HTTPException(400, f"Unknown skill: {skill_id}")
-        result = await dispatch[skill_id]()
-        return {"id": request.get("id","task-1"), "status": {"state":"completed"},
+        result = await func(**dict(args))
+        return {"id": req.id, "status": {"state":"completed"},
                 "artifacts": [{"parts": [{"type":"text","text":result}]}]}
     except Exception as e:
         raise HTTPException(500, str(e))
@@ -572,8 +980,15 @@ async def tasks_send(request: dict):
 
 # ── 실행 ────────────────────────────────────────────
 if __name__ == "__main__":
-    if os.environ.get("RUN_MODE") == "stdio":
+    if RUN_MODE == "stdio":
+        from mcp.server.fastmcp import FastMCP
+        mcp = FastMCP("korean-crypto")
+        for tool in TOOLS:
+            mcp.tool()(tool)
         mcp.run()
     else:
         port = int(os.environ.get("PORT", 8000))
-        uvicorn.run(app, host="0.0.0.0", port=port)
+        uvicorn.run("main:app", host="0.0.0.0", port=port,
+                    loop="uvloop", http="httptools",
+                    workers=int(os.environ.get("WEB_CONCURRENCY", 1)),
+                    log_level="warning")